@@ -1,52 +1,101 @@
 """
 Database module for Supabase operations.
+
+Expects the SQL in migrations/ to have been applied, in particular the
+unique index on users.email (002_users_email_unique.sql) that
+create_account relies on to reject duplicate emails.
 """
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from postgrest.exceptions import APIError
+from postgrest.utils import SyncClient
 from supabase import create_client
 from config import SUPABASE_URL, SUPABASE_KEY
-from typing import Dict, Optional, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Connection pool settings for the PostgREST HTTP session
+HTTP_LIMITS = httpx.Limits(
+    max_connections=20, max_keepalive_connections=10, keepalive_expiry=1800
+)
+HTTP_TIMEOUT = httpx.Timeout(10.0, connect=2.0)
+
+# Postgres error code raised when a unique index is violated
+UNIQUE_VIOLATION = "23505"
+
+# Rows per request when listing users
+USERS_PAGE_SIZE = 500
 
 
 class DatabaseManager:
-    """Manage database operations with Supabase."""
+    """
+    Manage database operations with Supabase.
+
+    All instances share the state of the first one created, so the
+    Supabase client and its HTTP session are only set up once per process.
+    """
+
+    _instance: Optional["DatabaseManager"] = None
+    _instance_lock = threading.Lock()
 
     def __init__(self):
-        """Initialize Supabase client."""
-        self.client = create_client(SUPABASE_URL, SUPABASE_KEY)
-        self.table_name = "users"  # Using public.users table
+        """Initialize Supabase client, or reuse the shared one."""
+        with DatabaseManager._instance_lock:
+            if DatabaseManager._instance is not None:
+                self.__dict__ = DatabaseManager._instance.__dict__
+                return
+
+            self.client = create_client(SUPABASE_URL, SUPABASE_KEY)
+            self.table_name = "users"  # Using public.users table
+
+            # Swap the default PostgREST session for a pooled one so that
+            # every query reuses warm keep-alive connections. Like postgrest's
+            # own session it only sets the base URL and headers, plus the
+            # pool limits and timeouts.
+            postgrest = self.client.postgrest
+            default_session = postgrest.session
+            self._http = SyncClient(
+                base_url=default_session.base_url,
+                headers=default_session.headers,
+                limits=HTTP_LIMITS,
+                timeout=HTTP_TIMEOUT,
+            )
+            default_session.close()
+            postgrest.session = self._http
+            logger.debug("PostgREST HTTP pool limits: %s", HTTP_LIMITS)
 
-    def get_user_by_id_and_name(self, user_id: int, name: str) -> Optional[Dict]:
-        """
-        Get user from database by ID and name.
+            # Fetches the next page of paginated queries in the background
+            self._prefetch_pool = ThreadPoolExecutor(max_workers=1)
 
-        Args:
-            user_id: User ID
-            name: User name
+            DatabaseManager._instance = self
 
-        Returns:
-            User dictionary or None if not found
+    def close(self) -> None:
         """
-        try:
-            response = (
-                self.client.table(self.table_name)
-                .select("*")
-                .eq("id", user_id)
-                .eq("name", name)
-                .execute()
-            )
+        Stop background fetches and close the pooled HTTP session.
 
-            if response.data and len(response.data) > 0:
-                return response.data[0]
-            return None
-        except Exception as e:
-            print(f"Error fetching user: {e}")
-            return None
+        Managers sharing this state become unusable afterwards, but the
+        next DatabaseManager() sets up a fresh client.
+        """
+        with DatabaseManager._instance_lock:
+            if (
+                DatabaseManager._instance is not None
+                and DatabaseManager._instance.__dict__ is self.__dict__
+            ):
+                DatabaseManager._instance = None
+
+        self._prefetch_pool.shutdown(cancel_futures=True)
+        self._http.close()
 
-    def get_user_by_id(self, user_id: int) -> Optional[Dict]:
+    def get_user_by_id(self, user_id: int, columns: str = "*") -> Optional[Dict]:
         """
         Get user from database by ID only.
 
         Args:
             user_id: User ID
+            columns: Comma-separated columns to fetch (default all)
 
         Returns:
             User dictionary or None if not found
@@ -54,13 +103,16 @@ class DatabaseManager:
         try:
             response = (
                 self.client.table(self.table_name)
-                .select("*")
+                .select(columns)
                 .eq("id", user_id)
+                .limit(1)
+                .maybe_single()
                 .execute()
             )
 
-            if response.data and len(response.data) > 0:
-                return response.data[0]
+            # maybe_single() yields the row itself, or no data if not found
+            if response and response.data:
+                return response.data
             return None
         except Exception as e:
             print(f"Error fetching user: {e}")
@@ -77,50 +129,102 @@ class DatabaseManager:
         Returns:
             Balance or None if user not found
         """
-        user = self.get_user_by_id_and_name(user_id, name)
-        if user:
-            return user.get("balance", 0)
-        return None
-
-    def update_balance(self, user_id: int, new_balance: int) -> bool:
-        """
-        Update user balance in database.
-
-        Args:
-            user_id: User ID
-            new_balance: New balance amount
-
-        Returns:
-            True if successful, False otherwise
-        """
         try:
             response = (
                 self.client.table(self.table_name)
-                .update({"balance": new_balance})
+                .select("balance")
                 .eq("id", user_id)
+                .eq("name", name)
+                .limit(1)
+                .maybe_single()
                 .execute()
             )
 
-            if response.data:
-                return True
-            return False
+            if response and response.data:
+                return response.data.get("balance", 0)
+            return None
         except Exception as e:
-            print(f"Error updating balance: {e}")
-            return False
+            print(f"Error fetching balance: {e}")
+            return None
 
-    def get_all_users(self) -> List[Dict]:
+    def transfer(
+        self, sender_id: int, sender_name: str, receiver_id: int, amount: int
+    ) -> Tuple[bool, str, Optional[Dict]]:
         """
-        Get all users from database.
+        Transfer funds atomically using the `transfer` database function.
+
+        Args:
+            sender_id: Sender's user ID
+            sender_name: Sender's name
+            receiver_id: Receiver's user ID
+            amount: Amount to transfer
 
         Returns:
-            List of user dictionaries
+            Tuple of (success: bool, message: str, details: Optional[Dict])
+            where details holds the names and balances before/after
         """
         try:
-            response = self.client.table(self.table_name).select("*").execute()
-            return response.data if response.data else []
+            response = self.client.rpc(
+                "transfer",
+                {
+                    "sender_id": sender_id,
+                    "sender_name": sender_name,
+                    "receiver_id": receiver_id,
+                    "amount": amount,
+                },
+            ).execute()
+
+            if response.data:
+                return True, "Transfer completed", response.data
+            return False, "Failed to transfer funds", None
+        except APIError as e:
+            # Validation failures raised by the database function
+            return False, e.message, None
         except Exception as e:
-            print(f"Error fetching all users: {e}")
-            return []
+            return False, f"Error transferring funds: {e}", None
+
+    def _fetch_users_page(self, offset: int, page_size: int) -> List[Dict]:
+        """Fetch one page of users ordered by ID."""
+        response = (
+            self.client.table(self.table_name)
+            .select("*")
+            .order("id")
+            .range(offset, offset + page_size - 1)
+            .execute()
+        )
+        return response.data or []
+
+    def iter_all_users(self, page_size: int = USERS_PAGE_SIZE) -> Iterator[Dict]:
+        """
+        Iterate over all users in database, one page at a time.
+
+        The next page is requested in the background while the caller
+        consumes the current one.
+
+        Args:
+            page_size: Number of users fetched per request
+
+        Yields:
+            User dictionaries ordered by ID
+        """
+        offset = 0
+        next_page = self._prefetch_pool.submit(self._fetch_users_page, offset, page_size)
+        while True:
+            try:
+                rows = next_page.result()
+            except Exception as e:
+                print(f"Error fetching all users: {e}")
+                return
+
+            if len(rows) == page_size:
+                offset += page_size
+                next_page = self._prefetch_pool.submit(
+                    self._fetch_users_page, offset, page_size
+                )
+
+            yield from rows
+            if len(rows) < page_size:
+                return
 
     def create_account(self, name: str, email: str, initial_balance: int = 0) -> Tuple[bool, str, Optional[int]]:
         """
@@ -135,18 +239,7 @@ class DatabaseManager:
             Tuple of (success: bool, message: str, user_id: Optional[int])
         """
         try:
-            # Check if email already exists
-            existing = (
-                self.client.table(self.table_name)
-                .select("*")
-                .eq("email", email)
-                .execute()
-            )
-
-            if existing.data and len(existing.data) > 0:
-                return False, f"Email {email} already exists", None
-
-            # Create new account
+            # Create new account; duplicate emails are rejected by the unique index
             response = (
                 self.client.table(self.table_name)
                 .insert({"name": name, "email": email, "balance": initial_balance})
@@ -158,26 +251,25 @@ class DatabaseManager:
                 return True, f"Account created successfully for {name} with ID {user_id}", user_id
             return False, "Failed to create account", None
 
+        except APIError as e:
+            if e.code == UNIQUE_VIOLATION:
+                return False, f"Email {email} already exists", None
+            return False, f"Error creating account: {e}", None
         except Exception as e:
             return False, f"Error creating account: {e}", None
 
-    def delete_account(self, user_id: int) -> Tuple[bool, str]:
+    def delete_account(self, user_id: int, name: str) -> Tuple[bool, str]:
         """
         Delete an account from database.
 
         Args:
             user_id: User ID to delete
+            name: Account holder's name, already verified by the caller
 
         Returns:
             Tuple of (success: bool, message: str)
         """
         try:
-            # Check if user exists
-            user = self.get_user_by_id(user_id)
-            if not user:
-                return False, f"User with ID {user_id} not found"
-
-            # Delete user
             response = (
                 self.client.table(self.table_name)
                 .delete()
@@ -185,7 +277,11 @@ class DatabaseManager:
                 .execute()
             )
 
-            return True, f"Account for {user.get('name')} (ID: {user_id}) deleted successfully"
+            # The deleted rows are returned, so none means no such user
+            if not response.data:
+                return False, f"User with ID {user_id} not found"
+
+            return True, f"Account for {name} (ID: {user_id}) deleted successfully"
 
         except Exception as e:
             return False, f"Error deleting account: {e}"
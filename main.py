@@ -1,37 +1,76 @@
 """
 Main CLI interface for the bank management system.
 """
-from transfer import TransferManager
-from database import DatabaseManager
+import itertools
+import sys
+from database import USERS_PAGE_SIZE
+from transfer import _BAR60, TransferManager
+
+_BAR80 = "=" * 80
+_BAR100 = "=" * 100
+_WARN60 = "!" * 60
+
+_format_user_row = "{id:<5} {name:<25} {email:<30} ₹{balance:<14}\n".format_map
+
+_MENU = "\n".join([
+    "",
+    _BAR60,
+    "BANK MANAGEMENT SYSTEM",
+    _BAR60,
+    "1. Check Balance",
+    "2. Transfer Funds",
+    "3. Create Account",
+    "4. Delete Account",
+    "5. View All Users",
+    "6. View Transaction History",
+    "7. Exit",
+    _BAR60,
+])
 
 
 def display_menu():
     """Display main menu options."""
-    print("\n" + "=" * 60)
-    print("BANK MANAGEMENT SYSTEM")
-    print("=" * 60)
-    print("1. Check Balance")
-    print("2. Transfer Funds")
-    print("3. Create Account")
-    print("4. Delete Account")
-    print("5. View All Users")
-    print("6. View Transaction History")
-    print("7. Exit")
-    print("=" * 60)
+    print(_MENU)
+
+
+def read_int(prompt, default=None):
+    """
+    Read an integer from the user, re-prompting until the input is valid.
+
+    Entering "q" cancels. Empty input returns the default, or cancels when
+    there is none.
+
+    Args:
+        prompt: Prompt shown to the user
+        default: Value returned for empty input, if given
+
+    Returns:
+        The integer entered, or None if the user cancelled
+    """
+    while True:
+        text = input(prompt).strip()
+        if text.lower() == "q":
+            return None
+        if not text:
+            return default
+        if text.removeprefix("-").isdecimal():
+            return int(text)
+        print("Please enter a valid integer, or 'q' to cancel.")
 
 
 def check_balance_option(transfer_manager):
     """Handle balance check option."""
     try:
-        user_id = int(input("Enter User ID: "))
+        user_id = read_int("Enter User ID: ")
+        if user_id is None:
+            print("Cancelled.")
+            return
         name = input("Enter Name: ").strip()
 
         success, message, balance = transfer_manager.check_balance(user_id, name)
         print("\n" + message)
         if success:
             print(f"Balance: ₹{balance}")
-    except ValueError:
-        print("Invalid User ID. Please enter a number.")
     except Exception as e:
         print(f"Error: {e}")
 
@@ -39,10 +78,19 @@ def check_balance_option(transfer_manager):
 def transfer_funds_option(transfer_manager):
     """Handle fund transfer option."""
     try:
-        sender_id = int(input("Enter Sender ID: "))
+        sender_id = read_int("Enter Sender ID: ")
+        if sender_id is None:
+            print("Cancelled.")
+            return
         sender_name = input("Enter Sender Name: ").strip()
-        receiver_id = int(input("Enter Receiver ID: "))
-        amount = int(input("Enter Amount to Transfer: "))
+        receiver_id = read_int("Enter Receiver ID: ")
+        if receiver_id is None:
+            print("Cancelled.")
+            return
+        amount = read_int("Enter Amount to Transfer: ")
+        if amount is None:
+            print("Cancelled.")
+            return
 
         success, message = transfer_manager.transfer_funds(
             sender_id, sender_name, receiver_id, amount
@@ -56,8 +104,6 @@ def transfer_funds_option(transfer_manager):
         else:
             print(f"\n✗ {message}")
 
-    except ValueError:
-        print("Invalid input. Please enter valid numbers.")
     except Exception as e:
         print(f"Error: {e}")
 
@@ -67,9 +113,10 @@ def create_account_option(transfer_manager):
     try:
         name = input("Enter Name: ").strip()
         email = input("Enter Email: ").strip()
-        
-        balance_input = input("Enter Initial Balance (default 0): ").strip()
-        initial_balance = int(balance_input) if balance_input else 0
+        initial_balance = read_int("Enter Initial Balance (default 0): ", default=0)
+        if initial_balance is None:
+            print("Cancelled.")
+            return
 
         success, message, user_id = transfer_manager.create_account(name, email, initial_balance)
 
@@ -78,8 +125,6 @@ def create_account_option(transfer_manager):
         else:
             print(f"\n✗ {message}")
 
-    except ValueError:
-        print("Invalid input. Please enter valid numbers for balance.")
     except Exception as e:
         print(f"Error: {e}")
 
@@ -87,13 +132,16 @@ def create_account_option(transfer_manager):
 def delete_account_option(transfer_manager):
     """Handle account deletion option."""
     try:
-        user_id = int(input("Enter User ID to Delete: "))
-        confirm_name = input("Enter the account holder's name to confirm deletion: ").strip()
+        user_id = read_int("Enter User ID to Delete: ")
+        if user_id is None:
+            print("Cancelled.")
+            return
+        confirm_name = sys.intern(
+            input("Enter the account holder's name to confirm deletion: ").strip()
+        )
 
         # Show warning
-        print("\n" + "!" * 60)
-        print("WARNING: This action cannot be undone!")
-        print("!" * 60)
+        print(f"\n{_WARN60}\nWARNING: This action cannot be undone!\n{_WARN60}")
         confirm = input("Are you sure you want to delete this account? (yes/no): ").strip().lower()
 
         if confirm != "yes":
@@ -107,33 +155,38 @@ def delete_account_option(transfer_manager):
         else:
             print(f"\n✗ {message}")
 
-    except ValueError:
-        print("Invalid User ID. Please enter a number.")
     except Exception as e:
         print(f"Error: {e}")
 
-def view_all_users_option():
+def view_all_users_option(transfer_manager):
     """Handle view all users option."""
-    db = DatabaseManager()
-    users = db.get_all_users()
+    users = transfer_manager.db.iter_all_users()
+    first_user = next(users, None)
 
-    if not users:
+    if first_user is None:
         print("\nNo users found in database.")
         return
 
-    print("\n" + "=" * 80)
-    print(f"{'ID':<5} {'Name':<25} {'Email':<30} {'Balance':<15}")
-    print("=" * 80)
-
-    for user in users:
-        user_id = user.get("id", "N/A")
-        name = user.get("name", "N/A")
-        email = user.get("email", "N/A")
-        balance = user.get("balance", 0)
+    sys.stdout.write(f"\n{_BAR80}\n{'ID':<5} {'Name':<25} {'Email':<30} {'Balance':<15}\n{_BAR80}\n")
 
-        print(f"{user_id:<5} {name:<25} {email:<30} ₹{balance:<14}")
+    # Format and write the table one page of rows at a time
+    rows = itertools.chain((first_user,), users)
+    while True:
+        page = "".join(
+            _format_user_row({
+                "id": user.get("id", "N/A"),
+                "name": user.get("name", "N/A"),
+                "email": user.get("email", "N/A"),
+                "balance": user.get("balance", 0),
+            })
+            for user in itertools.islice(rows, USERS_PAGE_SIZE)
+        )
+        if not page:
+            break
+        sys.stdout.write(page)
 
-    print("=" * 80)
+    sys.stdout.write(f"{_BAR80}\n")
+    sys.stdout.flush()
 
 
 def view_transaction_history_option(transfer_manager):
@@ -144,44 +197,50 @@ def view_transaction_history_option(transfer_manager):
         print("\nNo transactions found.")
         return
 
-    print("\n" + "=" * 100)
-    print("TRANSACTION HISTORY")
-    print("=" * 100)
+    # Build the whole report and write it in one go
+    format_details = transfer_manager.format_transaction_details
+    report = "".join(
+        f"\nTransaction {i}:\n{format_details(transaction)}\n"
+        for i, transaction in enumerate(transactions, 1)
+    )
+    sys.stdout.write(f"\n{_BAR100}\nTRANSACTION HISTORY\n{_BAR100}\n{report}")
+    sys.stdout.flush()
 
-    for i, transaction in enumerate(transactions, 1):
-        print(f"\nTransaction {i}:")
-        transfer_manager.print_transaction_details(transaction)
+
+# Menu choice -> option handler
+_HANDLERS = {
+    "1": check_balance_option,
+    "2": transfer_funds_option,
+    "3": create_account_option,
+    "4": delete_account_option,
+    "5": view_all_users_option,
+    "6": view_transaction_history_option,
+}
 
 
 def main():
     """Main function to run the CLI."""
     transfer_manager = TransferManager()
 
-    print("\n" + "=" * 60)
-    print("Welcome to Bank Management System")
-    print("=" * 60)
+    print(f"\n{_BAR60}\nWelcome to Bank Management System\n{_BAR60}")
 
-    while True:
-        display_menu()
-        choice = input("Enter your choice (1-7): ").strip()
-
-        if choice == "1":
-            check_balance_option(transfer_manager)
-        elif choice == "2":
-            transfer_funds_option(transfer_manager)
-        elif choice == "3":
-            create_account_option(transfer_manager)
-        elif choice == "4":
-            delete_account_option(transfer_manager)
-        elif choice == "5":
-            view_all_users_option()
-        elif choice == "6":
-            view_transaction_history_option(transfer_manager)
-        elif choice == "7":
-            print("\nThank you for using Bank Management System. Goodbye!")
-            break
-        else:
-            print("Invalid choice. Please enter a number between 1 and 7.")
+    try:
+        while True:
+            display_menu()
+            choice = input("Enter your choice (1-7): ").strip()
+
+            handler = _HANDLERS.get(choice)
+            if handler:
+                handler(transfer_manager)
+            elif choice == "7":
+                print("\nThank you for using Bank Management System. Goodbye!")
+                break
+            else:
+                print("Invalid choice. Please enter a number between 1 and 7.")
+    except (KeyboardInterrupt, EOFError):
+        print("\nExiting Bank Management System. Goodbye!")
+    finally:
+        transfer_manager.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,68 @@
+-- Atomic fund transfer between two users.
+--
+-- Validates the sender, checks the balance and moves the money inside a
+-- single transaction, so a transfer costs one round trip from the client.
+-- Returns the balances before and after the transfer as JSON.
+
+create or replace function public.transfer(
+    sender_id bigint,
+    sender_name text,
+    receiver_id bigint,
+    amount bigint
+) returns json
+language plpgsql
+as $$
+declare
+    v_sender public.users%rowtype;
+    v_receiver public.users%rowtype;
+begin
+    if amount <= 0 then
+        raise exception 'Transfer amount must be greater than 0';
+    end if;
+
+    if sender_id = receiver_id then
+        raise exception 'Sender and receiver must be different accounts';
+    end if;
+
+    -- Lock both rows in a fixed order to avoid deadlocks between
+    -- concurrent transfers in opposite directions
+    perform 1
+    from public.users u
+    where u.id in (transfer.sender_id, transfer.receiver_id)
+    order by u.id
+    for update;
+
+    select * into v_sender
+    from public.users u
+    where u.id = transfer.sender_id and u.name = transfer.sender_name;
+
+    if not found then
+        raise exception 'Sender with ID % and name ''%'' not found', sender_id, sender_name;
+    end if;
+
+    select * into v_receiver
+    from public.users u
+    where u.id = transfer.receiver_id;
+
+    if not found then
+        raise exception 'Receiver with ID % not found', receiver_id;
+    end if;
+
+    if v_sender.balance < amount then
+        raise exception 'Insufficient balance. Current balance: ₹%, Required: ₹%',
+            v_sender.balance, amount;
+    end if;
+
+    update public.users set balance = balance - amount where id = transfer.sender_id;
+    update public.users set balance = balance + amount where id = transfer.receiver_id;
+
+    return json_build_object(
+        'sender_name', v_sender.name,
+        'receiver_name', v_receiver.name,
+        'sender_balance_before', v_sender.balance,
+        'sender_balance_after', v_sender.balance - amount,
+        'receiver_balance_before', v_receiver.balance,
+        'receiver_balance_after', v_receiver.balance + amount
+    );
+end;
+$$;
@@ -0,0 +1,6 @@
+-- Enforce one account per email address.
+--
+-- create_account relies on this index to reject duplicates instead of
+-- checking for an existing row before inserting.
+
+create unique index if not exists users_email_key on public.users (email);
@@ -0,0 +1,17 @@
+-- Persistent transfer history.
+--
+-- Rows are written by transfer() (see 005_record_transfers.sql).
+
+create table if not exists public.transactions (
+    id bigint generated always as identity primary key,
+    sender_id bigint not null,
+    sender_name text not null,
+    receiver_id bigint not null,
+    receiver_name text,
+    amount bigint not null,
+    sender_balance_before bigint not null,
+    sender_balance_after bigint not null,
+    receiver_balance_before bigint not null,
+    receiver_balance_after bigint not null,
+    created_at timestamptz not null default now()
+);
@@ -0,0 +1,104 @@
+-- Guarded balance updates.
+--
+-- debit() and credit() change a balance with a single UPDATE ... RETURNING,
+-- so the check and the write happen atomically on the row without a
+-- separate read. transfer() is redefined on top of them.
+--
+-- All three run with the caller's privileges, so calling debit() or
+-- credit() directly allows nothing beyond what the caller could already
+-- do with an UPDATE on public.users.
+
+create or replace function public.debit(id bigint, name text, amt bigint)
+returns bigint
+language plpgsql
+as $$
+declare
+    new_balance bigint;
+    current_balance bigint;
+begin
+    update public.users u
+    set balance = u.balance - debit.amt
+    where u.id = debit.id and u.name = debit.name and u.balance >= debit.amt
+    returning u.balance into new_balance;
+
+    if not found then
+        select u.balance into current_balance
+        from public.users u
+        where u.id = debit.id and u.name = debit.name;
+
+        if found then
+            raise exception 'Insufficient balance. Current balance: ₹%, Required: ₹%',
+                current_balance, debit.amt;
+        end if;
+        raise exception 'Sender with ID % and name ''%'' not found', debit.id, debit.name;
+    end if;
+
+    return new_balance;
+end;
+$$;
+
+create or replace function public.credit(id bigint, amt bigint)
+returns bigint
+language plpgsql
+as $$
+declare
+    new_balance bigint;
+begin
+    update public.users u
+    set balance = u.balance + credit.amt
+    where u.id = credit.id
+    returning u.balance into new_balance;
+
+    if not found then
+        raise exception 'Receiver with ID % not found', credit.id;
+    end if;
+
+    return new_balance;
+end;
+$$;
+
+create or replace function public.transfer(
+    sender_id bigint,
+    sender_name text,
+    receiver_id bigint,
+    amount bigint
+) returns json
+language plpgsql
+as $$
+declare
+    v_sender_after bigint;
+    v_receiver_after bigint;
+    v_receiver_name text;
+begin
+    if amount <= 0 then
+        raise exception 'Transfer amount must be greater than 0';
+    end if;
+
+    if sender_id = receiver_id then
+        raise exception 'Sender and receiver must be different accounts';
+    end if;
+
+    -- Touch the rows in a fixed order to avoid deadlocks between
+    -- concurrent transfers in opposite directions
+    if sender_id < receiver_id then
+        v_sender_after := public.debit(sender_id, sender_name, amount);
+        v_receiver_after := public.credit(receiver_id, amount);
+    else
+        v_receiver_after := public.credit(receiver_id, amount);
+        v_sender_after := public.debit(sender_id, sender_name, amount);
+    end if;
+
+    select u.name into v_receiver_name
+    from public.users u
+    where u.id = transfer.receiver_id;
+
+    return json_build_object(
+        'sender_name', sender_name,
+        'receiver_name', v_receiver_name,
+        'sender_balance_before', v_sender_after + amount,
+        'sender_balance_after', v_sender_after,
+        'receiver_balance_before', v_receiver_after - amount,
+        'receiver_balance_after', v_receiver_after
+    );
+end;
+$$;
@@ -0,0 +1,72 @@
+-- Record each transfer in public.transactions.
+--
+-- Redefines transfer() so the history row is written in the same
+-- transaction as the balance changes, with no extra round trip.
+
+create or replace function public.transfer(
+    sender_id bigint,
+    sender_name text,
+    receiver_id bigint,
+    amount bigint
+) returns json
+language plpgsql
+as $$
+declare
+    v_sender_after bigint;
+    v_receiver_after bigint;
+    v_receiver_name text;
+begin
+    if amount <= 0 then
+        raise exception 'Transfer amount must be greater than 0';
+    end if;
+
+    if sender_id = receiver_id then
+        raise exception 'Sender and receiver must be different accounts';
+    end if;
+
+    -- Touch the rows in a fixed order to avoid deadlocks between
+    -- concurrent transfers in opposite directions
+    if sender_id < receiver_id then
+        v_sender_after := public.debit(sender_id, sender_name, amount);
+        v_receiver_after := public.credit(receiver_id, amount);
+    else
+        v_receiver_after := public.credit(receiver_id, amount);
+        v_sender_after := public.debit(sender_id, sender_name, amount);
+    end if;
+
+    select u.name into v_receiver_name
+    from public.users u
+    where u.id = transfer.receiver_id;
+
+    insert into public.transactions (
+        sender_id,
+        sender_name,
+        receiver_id,
+        receiver_name,
+        amount,
+        sender_balance_before,
+        sender_balance_after,
+        receiver_balance_before,
+        receiver_balance_after
+    ) values (
+        transfer.sender_id,
+        transfer.sender_name,
+        transfer.receiver_id,
+        v_receiver_name,
+        transfer.amount,
+        v_sender_after + transfer.amount,
+        v_sender_after,
+        v_receiver_after - transfer.amount,
+        v_receiver_after
+    );
+
+    return json_build_object(
+        'sender_name', sender_name,
+        'receiver_name', v_receiver_name,
+        'sender_balance_before', v_sender_after + amount,
+        'sender_balance_after', v_sender_after,
+        'receiver_balance_before', v_receiver_after - amount,
+        'receiver_balance_after', v_receiver_after
+    );
+end;
+$$;
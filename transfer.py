@@ -1,8 +1,91 @@
 """
 Transfer module for handling money transfers between users.
 """
+import sys
+from array import array
+from dataclasses import dataclass
 from database import DatabaseManager
-from typing import Tuple, Dict, Optional
+from typing import Tuple, Iterator, Optional
+
+_BAR60 = "=" * 60
+
+# Number of transactions kept in memory for the history view
+TRANSACTION_HISTORY_SIZE = 1000
+
+
+@dataclass(slots=True, frozen=True)
+class TxnRecord:
+    """A completed transfer between two users."""
+
+    sender_id: int
+    sender_name: str
+    receiver_id: int
+    receiver_name: str
+    amount: int
+    sender_balance_before: int
+    sender_balance_after: int
+    receiver_balance_before: int
+    receiver_balance_after: int
+
+
+class TransactionLog:
+    """
+    Transfer history stored column-wise.
+
+    Numeric fields live in compact int64 arrays and names in plain lists,
+    so each record costs a few machine words instead of a whole object.
+    Records are rebuilt as TxnRecord instances when read. Once maxlen
+    records are stored, the oldest ones are dropped.
+    """
+
+    INT_FIELDS = (
+        "sender_id",
+        "receiver_id",
+        "amount",
+        "sender_balance_before",
+        "sender_balance_after",
+        "receiver_balance_before",
+        "receiver_balance_after",
+    )
+    STR_FIELDS = ("sender_name", "receiver_name")
+
+    def __init__(self, maxlen: int = TRANSACTION_HISTORY_SIZE):
+        """Initialize empty columns."""
+        self.maxlen = maxlen
+        self.columns = {field: array("q") for field in self.INT_FIELDS}
+        self.columns.update({field: [] for field in self.STR_FIELDS})
+
+    def append(self, record: TxnRecord) -> None:
+        """
+        Add a transaction record.
+
+        Args:
+            record: Transaction record
+        """
+        size = len(self)
+        try:
+            for field, column in self.columns.items():
+                column.append(getattr(record, field))
+        except (TypeError, OverflowError):
+            # Undo the partial append so the columns stay aligned
+            for column in self.columns.values():
+                del column[size:]
+            raise
+
+        excess = len(self) - self.maxlen
+        if excess > 0:
+            for column in self.columns.values():
+                del column[:excess]
+
+    def __len__(self) -> int:
+        return len(self.columns["amount"])
+
+    def __getitem__(self, index: int) -> TxnRecord:
+        return TxnRecord(**{field: column[index] for field, column in self.columns.items()})
+
+    def __iter__(self) -> Iterator[TxnRecord]:
+        for index in range(len(self)):
+            yield self[index]
 
 
 class TransferManager:
@@ -11,7 +94,11 @@ class TransferManager:
     def __init__(self):
         """Initialize TransferManager with database connection."""
         self.db = DatabaseManager()
-        self.transactions = []
+        self.transactions = TransactionLog()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.db.close()
 
     def check_balance(self, user_id: int, name: str) -> Tuple[bool, str, Optional[int]]:
         """
@@ -53,84 +140,71 @@ class TransferManager:
         if amount <= 0:
             return False, "Transfer amount must be greater than 0"
 
-        # Get sender details
-        sender = self.db.get_user_by_id_and_name(sender_id, sender_name)
-        if not sender:
-            return False, f"Sender with ID {sender_id} and name '{sender_name}' not found"
-
-        # Get receiver details
-        receiver = self.db.get_user_by_id(receiver_id)
-        if not receiver:
-            return False, f"Receiver with ID {receiver_id} not found"
-
-        sender_balance = sender.get("balance", 0)
-        receiver_balance = receiver.get("balance", 0)
-
-        # Check if sender has sufficient balance
-        if sender_balance < amount:
-            return (
-                False,
-                f"Insufficient balance. Current balance: ₹{sender_balance}, Required: ₹{amount}",
-            )
-
-        # Perform transfer
-        new_sender_balance = sender_balance - amount
-        new_receiver_balance = receiver_balance + amount
-
-        # Update sender balance
-        if not self.db.update_balance(sender_id, new_sender_balance):
-            return False, "Failed to update sender balance"
-
-        # Update receiver balance
-        if not self.db.update_balance(receiver_id, new_receiver_balance):
-            # Rollback sender balance if receiver update fails
-            self.db.update_balance(sender_id, sender_balance)
-            return False, "Failed to update receiver balance. Transaction rolled back"
+        # Validate, debit and credit in a single database transaction
+        success, message, result = self.db.transfer(
+            sender_id, sender_name, receiver_id, amount
+        )
+        if not success:
+            return False, message
 
         # Record transaction
-        transaction_record = {
-            "sender_id": sender_id,
-            "sender_name": sender_name,
-            "receiver_id": receiver_id,
-            "receiver_name": receiver.get("name"),
-            "amount": amount,
-            "sender_balance_before": sender_balance,
-            "sender_balance_after": new_sender_balance,
-            "receiver_balance_before": receiver_balance,
-            "receiver_balance_after": new_receiver_balance,
-        }
+        transaction_record = TxnRecord(
+            sender_id=sender_id,
+            sender_name=sender_name,
+            receiver_id=receiver_id,
+            receiver_name=result.get("receiver_name"),
+            amount=amount,
+            sender_balance_before=result.get("sender_balance_before"),
+            sender_balance_after=result.get("sender_balance_after"),
+            receiver_balance_before=result.get("receiver_balance_before"),
+            receiver_balance_after=result.get("receiver_balance_after"),
+        )
         self.transactions.append(transaction_record)
 
         return (
             True,
-            f"Successfully transferred ₹{amount} from {sender_name} to {receiver.get('name')}",
+            f"Successfully transferred ₹{amount} from {sender_name} to {result.get('receiver_name')}",
         )
 
-    def get_transaction_history(self) -> list:
+    def get_transaction_history(self) -> TransactionLog:
         """
         Get all transactions history.
 
         Returns:
-            List of transaction records
+            Sequence of transaction records
         """
         return self.transactions
 
-    def print_transaction_details(self, transaction: Dict) -> None:
+    def format_transaction_details(self, transaction: TxnRecord) -> str:
+        """
+        Format details of a transaction.
+
+        Args:
+            transaction: Transaction record
+
+        Returns:
+            Multi-line transaction details block
+        """
+        return (
+            f"\n{_BAR60}\n"
+            "TRANSACTION DETAILS\n"
+            f"{_BAR60}\n"
+            f"From: {transaction.sender_name} (ID: {transaction.sender_id})\n"
+            f"To: {transaction.receiver_name} (ID: {transaction.receiver_id})\n"
+            f"Amount: ₹{transaction.amount}\n"
+            f"Sender Balance: ₹{transaction.sender_balance_before} → ₹{transaction.sender_balance_after}\n"
+            f"Receiver Balance: ₹{transaction.receiver_balance_before} → ₹{transaction.receiver_balance_after}\n"
+            f"{_BAR60}\n"
+        )
+
+    def print_transaction_details(self, transaction: TxnRecord) -> None:
         """
         Print details of a transaction.
 
         Args:
-            transaction: Transaction dictionary
-        """
-        print("\n" + "=" * 60)
-        print("TRANSACTION DETAILS")
-        print("=" * 60)
-        print(f"From: {transaction['sender_name']} (ID: {transaction['sender_id']})")
-        print(f"To: {transaction['receiver_name']} (ID: {transaction['receiver_id']})")
-        print(f"Amount: ₹{transaction['amount']}")
-        print(f"Sender Balance: ₹{transaction['sender_balance_before']} → ₹{transaction['sender_balance_after']}")
-        print(f"Receiver Balance: ₹{transaction['receiver_balance_before']} → ₹{transaction['receiver_balance_after']}")
-        print("=" * 60 + "\n")
+            transaction: Transaction record
+        """
+        print(self.format_transaction_details(transaction))
 
     def create_account(self, name: str, email: str, initial_balance: int = 0) -> Tuple[bool, str, Optional[int]]:
         """
@@ -169,13 +243,15 @@ class TransferManager:
         if not user_id:
             return False, "User ID is required"
 
-        # Get user to verify name
-        user = self.db.get_user_by_id(user_id)
+        # Get user's name to verify it
+        user = self.db.get_user_by_id(user_id, columns="name")
         if not user:
             return False, f"User with ID {user_id} not found"
 
-        # Verify confirmation name matches
-        if user.get("name") != confirm_name:
+        # Verify confirmation name matches; both sides are interned so a
+        # repeated match is an identity check
+        name = user.get("name")
+        if not name or sys.intern(name) != confirm_name:
             return False, "Name confirmation failed. Account not deleted."
 
-        return self.db.delete_account(user_id)
+        return self.db.delete_account(user_id, name)